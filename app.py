@@ -3,12 +3,15 @@ Password Generator Flask Application
 Enhanced with cryptographic security, input validation, error handling, and rate limiting
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, jsonify, make_response, request, send_from_directory
 from flask_limiter import Limiter  # pyright: ignore[reportMissingImports]
 from flask_limiter.util import get_remote_address  # pyright: ignore[reportMissingImports]
+import functools
+import json
 import os
 import logging
 import logic  # Import shared logic
+from idempotency import IdempotencyCache, IdempotencyConflict, IdempotencyCorrupted, IdempotencyInProgress
 
 # ========== LOGGING CONFIGURATION - START ==========
 logging.basicConfig(
@@ -25,6 +28,7 @@ class ValidationError(Exception):
 # ========== CUSTOM EXCEPTION CLASSES - END ==========
 
 app = Flask(__name__, static_folder=".", static_url_path="")
+app.config["RATELIMIT_ENABLED"] = os.environ.get("RATELIMIT_ENABLED", "True").lower() == "true"
 
 # ========== RATE LIMITING CONFIGURATION - START ==========
 limiter = Limiter(
@@ -36,6 +40,87 @@ limiter = Limiter(
 logger.info("Rate limiter initialized: 100 requests per minute per IP")
 # ========== RATE LIMITING CONFIGURATION - END ==========
 
+# ========== IDEMPOTENCY CONFIGURATION - START ==========
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# With IDEMPOTENCY_STORE_PATH the store file is shared by every worker process and
+# IDEMPOTENCY_SECRET is required; gunicorn.conf.py sets both for each server.
+# Without it the cache is private to this process.
+idempotency_cache = IdempotencyCache(
+    path=os.environ.get("IDEMPOTENCY_STORE_PATH"),
+    secret=os.environ.get("IDEMPOTENCY_SECRET"),
+    ttl_seconds=int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", 86400)),
+    max_entries=int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", 10000)),
+    max_bytes=int(os.environ.get("IDEMPOTENCY_MAX_BYTES", 4 * 1024 * 1024)),
+)
+logger.info(
+    f"Idempotency cache initialized: max {idempotency_cache.max_entries} entries, "
+    f"{idempotency_cache.max_bytes} bytes, TTL {idempotency_cache.ttl_seconds}s, "
+    f"store {idempotency_cache.path if idempotency_cache.shared else 'in-process'}"
+)
+if not idempotency_cache.shared:
+    logger.warning(
+        "Idempotency cache is private to this process; with multiple workers, "
+        "run gunicorn -c gunicorn.conf.py or set IDEMPOTENCY_STORE_PATH and IDEMPOTENCY_SECRET"
+    )
+
+
+def idempotent(view):
+    """
+    Replay the original response when a request is retried with the same
+    Idempotency-Key header, instead of generating a new password.
+    Only successful (200) responses are cached.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            return view(*args, **kwargs)
+
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return jsonify({"error": f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"}), 400
+
+        # Scope keys per endpoint only: mobile clients often retry from a different IP
+        scope = request.path
+
+        try:
+            cached = idempotency_cache.begin(scope, key, request.get_data())
+        except IdempotencyConflict as e:
+            logger.warning(f"Idempotency conflict: {str(e)}")
+            return jsonify({"error": str(e)}), 422
+        except IdempotencyInProgress as e:
+            return jsonify({"error": str(e)}), 409
+        except IdempotencyCorrupted as e:
+            logger.error(f"Idempotency store error: {str(e)}")
+            return jsonify({"error": "Stored response could not be verified. Please retry the request."}), 500
+
+        if cached is not None:
+            logger.info(f"Replayed idempotent response for {request.path}")
+            response = app.response_class(cached, mimetype="application/json")
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            idempotency_cache.release(scope, key)
+            raise
+
+        if response.status_code == 200:
+            idempotency_cache.complete(scope, key, response.get_data())
+        else:
+            idempotency_cache.release(scope, key)
+        return response
+
+    return wrapper
+# ========== IDEMPOTENCY CONFIGURATION - END ==========
+
+
+# ========== PRELOADED RESPONSES - START ==========
+# Serialized once at import (in the gunicorn master when preloading) and shared by all workers
+CONFIG_RESPONSE_BODY = json.dumps({"wordList": logic.get_word_list()}, separators=(",", ":")).encode()
+# ========== PRELOADED RESPONSES - END ==========
+
 
 # ========== VALIDATION FUNCTIONS - START ==========
 def validate_password_params(length, use_uppercase, use_lowercase, use_numbers, use_symbols):
@@ -99,13 +184,21 @@ def get_config():
     Return configuration data, including the word list.
     This allows the frontend to have the same word list as the backend.
     """
-    return jsonify({
-        "wordList": logic.get_word_list()
-    })
+    return app.response_class(CONFIG_RESPONSE_BODY, mimetype="application/json")
+
+
+@app.route("/api/idempotency-stats", methods=["GET"])
+def get_idempotency_stats():
+    """
+    Return idempotency cache usage (entries, bytes, hits, evictions) across all
+    workers sharing the store. Read-only, so polling does not block generation requests.
+    """
+    return jsonify(idempotency_cache.stats())
 
 
 @app.route("/api/generate-password", methods=["POST"])
 @limiter.limit("100 per minute")
+@idempotent
 def generate_password():
     """
     Generate a random password with specified parameters.
@@ -154,6 +247,7 @@ def generate_password():
 
 @app.route("/api/generate-passphrase", methods=["POST"])
 @limiter.limit("100 per minute")
+@idempotent
 def generate_passphrase():
     """
     Generate a passphrase using random words from the word list.
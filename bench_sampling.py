@@ -0,0 +1,72 @@
+"""
+Benchmark for passphrase word sampling.
+Compares SystemRandom.sample against logic.sample_words for word lists
+from 250 up to 1,000,000 entries, over a plain list and over the
+PackedWordList backend that generate_passphrase uses in production.
+
+Usage:
+    python bench_sampling.py [--repeat N] [--words K]
+"""
+
+import argparse
+import secrets
+import time
+import tracemalloc
+
+import logic
+
+SIZES = [250, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def build_word_list(n):
+    """Build a synthetic word list with n distinct entries."""
+    return [f"word{i}" for i in range(n)]
+
+
+def time_call(func, repeat):
+    """Return the average time (in microseconds) of func() over repeat runs."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def peak_memory(func):
+    """Return the peak memory (in KiB) allocated while running func() once."""
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark passphrase word sampling")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per measurement")
+    parser.add_argument("--words", type=int, default=6, help="Words drawn per passphrase")
+    args = parser.parse_args()
+
+    secure_random = secrets.SystemRandom()
+    columns = ["sample(list)", "sample_words(list)", "sample_words(packed)"]
+
+    print(f"{'n':>10} | " + " | ".join(f"{name + ' us':>24}" for name in columns)
+          + " | " + " | ".join(f"{name + ' KiB':>25}" for name in columns))
+    print("-" * 10 + ("-+-" + "-" * 24) * 3 + ("-+-" + "-" * 25) * 3)
+
+    for n in SIZES:
+        words = build_word_list(n)
+        packed = logic.PackedWordList(words)
+        calls = [
+            lambda: secure_random.sample(words, args.words),
+            lambda: logic.sample_words(words, args.words),
+            lambda: logic.sample_words(packed, args.words),
+        ]
+
+        times = [time_call(call, args.repeat) for call in calls]
+        memory = [peak_memory(call) for call in calls]
+        print(f"{n:>10,} | " + " | ".join(f"{t:>24.2f}" for t in times)
+              + " | " + " | ".join(f"{m:>25.2f}" for m in memory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Gunicorn configuration for Password Generator.
+Preloads the app in the master so Flask, Flask-Limiter, logic and their
+lookup tables are imported and built once, then shared with every worker
+through copy-on-write memory.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+    GUNICORN_PRELOAD=false gunicorn -c gunicorn.conf.py app:app   # per-worker imports
+"""
+
+import gc
+import os
+import secrets
+import shutil
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', 5001)}")
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True").lower() == "true"
+
+# Every worker must open the same idempotency store with the same key, so the
+# master picks both before forking (workers inherit the environment). The store
+# goes in a fresh owner-only (0700) directory with an unpredictable name.
+_store_dir = None
+if "IDEMPOTENCY_STORE_PATH" not in os.environ:
+    _shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    _store_dir = tempfile.mkdtemp(prefix="password-generator-idempotency-", dir=_shm)
+    os.environ["IDEMPOTENCY_STORE_PATH"] = os.path.join(_store_dir, "store.sqlite3")
+os.environ.setdefault("IDEMPOTENCY_SECRET", secrets.token_hex(32))
+
+if preload_app:
+    # Avoid collections in the master while the app is imported; objects that
+    # survive are frozen below so no worker's GC ever writes to their pages.
+    gc.disable()
+
+
+def pre_fork(server, worker):
+    """Move every object built so far into the permanent GC generation"""
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Re-enable garbage collection in the worker"""
+    if preload_app:
+        gc.enable()
+
+
+def on_exit(server):
+    """Remove the per-server idempotency store created above"""
+    if _store_dir is not None:
+        shutil.rmtree(_store_dir, ignore_errors=True)
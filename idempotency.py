@@ -0,0 +1,323 @@
+"""
+Idempotency cache for Password Generator API.
+Lets clients safely retry generation requests with an Idempotency-Key header:
+a replay returns the original response instead of generating a new one.
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import stat
+import threading
+import time
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+
+# Rough per-entry bookkeeping cost (row, index entry, digests) used for the memory cap
+ENTRY_OVERHEAD_BYTES = 200
+
+# A pending reservation older than this is treated as abandoned (e.g. its worker died)
+PENDING_TIMEOUT_SECONDS = 30
+
+# Most expired entries purged per write, so cleanup cost stays bounded per request
+PURGE_BATCH = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('entries', 0), ('bytes', 0);
+CREATE TABLE IF NOT EXISTS entries (
+    id BLOB PRIMARY KEY,
+    fingerprint BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    nonce BLOB,
+    ciphertext BLOB,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used);
+CREATE INDEX IF NOT EXISTS entries_expiry ON entries (expires_at);
+"""
+
+# ========== EXCEPTIONS ==========
+class IdempotencyConflict(Exception):
+    """Raised when an Idempotency-Key is reused with a different request body"""
+    pass
+
+
+class IdempotencyInProgress(Exception):
+    """Raised when a request with the same Idempotency-Key is still being processed"""
+    pass
+
+
+class IdempotencyCorrupted(Exception):
+    """Raised when a stored response fails authentication (the entry is dropped)"""
+    pass
+
+
+class IdempotencyStoreError(Exception):
+    """Raised when a shared store is misconfigured or its file is not safe to use"""
+    pass
+
+
+# ========== STORE FILE ==========
+def open_store_file(path):
+    """
+    Create (or safely reopen) a shared store file.
+
+    The directory must belong to this user and not be writable by others, so
+    nobody else can plant the file or SQLite's -wal/-shm companions. The file
+    itself is created with O_EXCL|O_NOFOLLOW and must be a regular file owned
+    by this user with no group/other permissions.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    dir_info = os.lstat(directory)
+    if not stat.S_ISDIR(dir_info.st_mode) or dir_info.st_uid != os.geteuid() or dir_info.st_mode & 0o022:
+        raise IdempotencyStoreError(f"Store directory {directory} must be owned by this user and not writable by others")
+
+    try:
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+        except FileExistsError:
+            fd = os.open(path, os.O_RDWR | os.O_NOFOLLOW)
+    except OSError as e:
+        raise IdempotencyStoreError(f"Cannot open store file {path}: {e}")
+    try:
+        info = os.fstat(fd)
+    finally:
+        os.close(fd)
+    if not stat.S_ISREG(info.st_mode) or info.st_uid != os.geteuid() or info.st_mode & 0o077:
+        raise IdempotencyStoreError(f"Store file {path} must be a regular file owned by this user with mode 0600")
+
+
+# ========== CACHE ==========
+class IdempotencyCache:
+    """
+    Bounded TTL + LRU cache of API responses, keyed by Idempotency-Key.
+
+    With a `path`, entries live in a SQLite file that every worker process opens
+    (memory-mapped, ideally on tmpfs such as /dev/shm), so a retry that lands on
+    another worker still finds the original response. A shared store needs a
+    `secret` (e.g. the IDEMPOTENCY_SECRET environment variable); the key is
+    never written to the file. Without a `path` the cache is private to the
+    process: an in-memory database with a random in-process key.
+
+    Responses are encrypted with ChaCha20-Poly1305 and rows are indexed by a
+    keyed hash, so raw keys and generated passwords are never stored in clear.
+    Entry and byte totals are kept as running counters so no request has to
+    scan the table.
+    """
+
+    def __init__(self, path=None, ttl_seconds=86400, max_entries=10000,
+                 max_bytes=4 * 1024 * 1024, secret=None, clock=time.time):
+        if path is not None and not secret:
+            raise IdempotencyStoreError("A shared idempotency store requires IDEMPOTENCY_SECRET to be set")
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._secret = hashlib.sha256(secret.encode()).digest() if secret else None
+        self._aead = None
+
+    @property
+    def shared(self):
+        return self.path is not None
+
+    # ----- Storage -----
+
+    def _connection(self):
+        """Open the store lazily, and again after fork (connections must not cross processes)"""
+        if self._conn is None or self._pid != os.getpid():
+            if self.shared:
+                open_store_file(self.path)
+                conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute(f"PRAGMA mmap_size={64 * 1024 * 1024}")
+            else:
+                # Private to this process, with a key that never leaves it
+                conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+                self._secret = secrets.token_bytes(32)
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+            self._aead = ChaCha20Poly1305(self._secret)
+        return self._conn
+
+    def _transaction(self):
+        """Run a write transaction that holds the store's lock across all processes"""
+        return _Transaction(self._connection(), "BEGIN IMMEDIATE")
+
+    def _read(self):
+        """Run a read-only transaction (does not block writers in WAL mode)"""
+        return _Transaction(self._connection(), "BEGIN")
+
+    def _bump(self, conn, name, amount=1):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def _totals(self, conn):
+        counters = dict(conn.execute("SELECT name, value FROM counters WHERE name IN ('entries', 'bytes')").fetchall())
+        return counters["entries"], counters["bytes"]
+
+    def _delete(self, conn, where, params):
+        """Delete matching entries, keep the running totals in step, and return how many went"""
+        sizes = conn.execute(f"DELETE FROM entries WHERE {where} RETURNING size", params).fetchall()
+        if sizes:
+            self._bump(conn, "entries", -len(sizes))
+            self._bump(conn, "bytes", -sum(size for (size,) in sizes))
+        return len(sizes)
+
+    def _evict(self, conn, now):
+        """Purge a batch of expired entries, then drop least recently used ones until under both caps"""
+        self._delete(conn, "id IN (SELECT id FROM entries WHERE expires_at <= ? LIMIT ?)", (now, PURGE_BATCH))
+
+        evicted = 0
+        while True:
+            count, total = self._totals(conn)
+            overflow = count - self.max_entries
+            if overflow <= 0 and total <= self.max_bytes:
+                break
+            removed = self._delete(conn, "id IN (SELECT id FROM entries ORDER BY last_used LIMIT ?)", (max(overflow, 1),))
+            if not removed:
+                break
+            evicted += removed
+        if evicted:
+            self._bump(conn, "evictions", evicted)
+
+    # ----- Key derivation -----
+
+    def _entry_id(self, scope, key):
+        material = scope.encode() + b"\0" + key.encode()
+        return hashlib.blake2b(material, key=self._secret, person=b"idempotency-id").digest()
+
+    def _fingerprint(self, body):
+        return hashlib.blake2b(body, key=self._secret, person=b"request-body", digest_size=16).digest()
+
+    # ----- Public API -----
+
+    def begin(self, scope, key, body):
+        """
+        Look up a request before processing it.
+
+        Returns the cached response body (bytes) on a replay, or None if the
+        caller should generate a response and then call complete() or release().
+        Raises IdempotencyConflict if the key was used with a different body,
+        IdempotencyInProgress if the original request has not finished yet, and
+        IdempotencyCorrupted if the stored response fails authentication.
+        """
+        now = self._clock()
+        with self._lock, self._transaction() as conn:
+            entry_id = self._entry_id(scope, key)
+            fingerprint = self._fingerprint(body)
+            row = conn.execute(
+                "SELECT fingerprint, created_at, expires_at, nonce, ciphertext FROM entries WHERE id = ?",
+                (entry_id,),
+            ).fetchone()
+
+            abandoned = row is not None and row[4] is None and row[1] + PENDING_TIMEOUT_SECONDS <= now
+            if row is None or row[2] <= now or abandoned:
+                self._bump(conn, "misses")
+                if row is not None:
+                    self._delete(conn, "id = ?", (entry_id,))
+                conn.execute(
+                    "INSERT INTO entries (id, fingerprint, created_at, expires_at, last_used, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (entry_id, fingerprint, now, now + self.ttl_seconds, now, ENTRY_OVERHEAD_BYTES),
+                )
+                self._bump(conn, "entries")
+                self._bump(conn, "bytes", ENTRY_OVERHEAD_BYTES)
+                self._evict(conn, now)
+                return None
+
+            stored_fingerprint, _, _, nonce, ciphertext = row
+            if not hmac.compare_digest(stored_fingerprint, fingerprint):
+                self._bump(conn, "conflicts")
+                raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+            if ciphertext is None:
+                raise IdempotencyInProgress("A request with this Idempotency-Key is still being processed")
+
+            try:
+                plaintext = self._aead.decrypt(nonce, ciphertext, entry_id)
+            except InvalidTag:
+                self._delete(conn, "id = ?", (entry_id,))
+                raise IdempotencyCorrupted("Stored response for this Idempotency-Key failed authentication")
+
+            conn.execute("UPDATE entries SET last_used = ? WHERE id = ?", (now, entry_id))
+            self._bump(conn, "hits")
+            return plaintext
+
+    def complete(self, scope, key, response_body):
+        """Store the response for a request started with begin()"""
+        now = self._clock()
+        with self._lock, self._transaction() as conn:
+            entry_id = self._entry_id(scope, key)
+            nonce = secrets.token_bytes(12)
+            ciphertext = self._aead.encrypt(nonce, response_body, entry_id)
+            # Only fills a still-pending reservation; a no-op if it was evicted meanwhile
+            filled = conn.execute(
+                "UPDATE entries SET nonce = ?, ciphertext = ?, size = ?, last_used = ? "
+                "WHERE id = ? AND ciphertext IS NULL RETURNING id",
+                (nonce, ciphertext, ENTRY_OVERHEAD_BYTES + len(ciphertext), now, entry_id),
+            ).fetchall()
+            if filled:
+                self._bump(conn, "bytes", len(ciphertext))
+                self._evict(conn, now)
+
+    def release(self, scope, key):
+        """Drop a pending reservation so the request can be retried (e.g. after an error)"""
+        with self._lock, self._transaction() as conn:
+            self._delete(conn, "id = ? AND ciphertext IS NULL", (self._entry_id(scope, key),))
+
+    def stats(self):
+        """
+        Return cache usage counters for monitoring (covering all workers when shared).
+        Read-only: entries that expired but are not purged yet are left out via the
+        expiry index, without taking the write lock.
+        """
+        now = self._clock()
+        with self._lock, self._read() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            expired, expired_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE expires_at <= ?", (now,)
+            ).fetchone()
+        return {
+            "entries": counters["entries"] - expired,
+            "bytes": counters["bytes"] - expired_bytes,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "conflicts": counters.get("conflicts", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+
+class _Transaction:
+    """BEGIN ... COMMIT/ROLLBACK around a block; commits even when an
+    Idempotency* exception is raised so counters and drops are kept"""
+
+    def __init__(self, conn, begin):
+        self.conn = conn
+        self.begin = begin
+
+    def __enter__(self):
+        self.conn.execute(self.begin)
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None or issubclass(exc_type, (IdempotencyConflict, IdempotencyInProgress, IdempotencyCorrupted)):
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
@@ -0,0 +1,461 @@
+"""
+Load test harness for Password Generator.
+Starts the Flask app under gunicorn with N workers on localhost, replays a
+weighted mix of API requests with asyncio, and writes a JSON report
+(throughput, latency percentiles, rate limiter rejections, per-worker RSS)
+so runs can be compared across commits.
+
+Usage:
+    python loadtest.py --workers 4 --concurrency 32 --duration 30
+    python loadtest.py --mix password=50,passphrase=30,config=10,batch=10
+    python loadtest.py --url http://127.0.0.1:5001   # reuse a running server
+    python loadtest.py --no-preload                   # compare worker memory without preloading
+
+Requires gunicorn (pip install gunicorn) unless --url is given.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MIX = "password=50,passphrase=30,config=10,batch=10"
+
+# Requests sent by each scenario. "batch" has no dedicated endpoint, so it is
+# modelled as a client asking for several credentials back to back.
+PASSWORD_BODY = {"length": 16, "useUppercase": True, "useLowercase": True,
+                 "useNumbers": True, "useSymbols": True, "excludeAmbiguous": False}
+PASSPHRASE_BODY = {"wordCount": 4, "separator": "-", "addNumbers": True,
+                   "addSymbols": True, "capitalize": "title"}
+BATCH_SIZE = 5
+
+# Seconds before a single request is abandoned and counted as an error
+REQUEST_TIMEOUT = 10
+
+# Documented memory target: private (unshared) memory per preloaded worker after
+# a run. Pages shared with the master through preloading do not count against it.
+# Measured at 7.0-7.1 MiB with preload vs 22.9-23.0 MiB without (see README), so
+# 8 MiB leaves ~13% headroom and fails clearly if preloading stops working.
+WORKER_USS_TARGET_KIB = 8 * 1024
+
+
+# ========== HTTP CLIENT ==========
+async def http_request(host, port, method, path, body=None):
+    """
+    Send one HTTP/1.1 request and return its status code.
+    Uses a fresh connection per request (gunicorn sync workers close it anyway).
+    """
+    payload = json.dumps(body).encode() if body is not None else b""
+    head = (
+        f"{method} {path} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        "Connection: close\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n"
+    ).encode()
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(head + payload)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()  # drain headers and body until the server closes
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+def build_scenarios():
+    """Map scenario name to a list of (method, path, body) requests"""
+    return {
+        "password": [("POST", "/api/generate-password", PASSWORD_BODY)],
+        "passphrase": [("POST", "/api/generate-passphrase", PASSPHRASE_BODY)],
+        "config": [("GET", "/api/config", None)],
+        "batch": [("POST", "/api/generate-password", PASSWORD_BODY)] * BATCH_SIZE,
+    }
+
+
+def parse_mix(text):
+    """Parse 'password=50,passphrase=30' into {'password': 50, 'passphrase': 30}"""
+    scenarios = build_scenarios()
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in scenarios:
+            raise ValueError(f"Unknown scenario '{name}'. Choose from: {', '.join(scenarios)}")
+        mix[name] = float(weight or 1)
+        if mix[name] < 0:
+            raise ValueError(f"Weight for '{name}' must not be negative")
+    if sum(mix.values()) <= 0:
+        raise ValueError("At least one scenario needs a positive weight")
+    return mix
+
+
+# ========== LOAD GENERATION ==========
+class Results:
+    """
+    Collects per-scenario latencies, status codes and failures.
+    Timed-out requests are kept in the latencies at the timeout value so that
+    p99/max reflect the slowest requests under overload.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.failures = {}
+        self.errors = 0
+        self.timeouts = 0
+
+    def record(self, scenario, latency, status):
+        self.latencies.setdefault(scenario, []).append(latency)
+        counts = self.statuses.setdefault(scenario, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def record_failure(self, scenario, kind, latency=None):
+        """Count a failed request ('timeout' or 'connection'); timeouts also add their latency"""
+        self.errors += 1
+        if kind == "timeout":
+            self.timeouts += 1
+        counts = self.failures.setdefault(scenario, {})
+        counts[kind] = counts.get(kind, 0) + 1
+        if latency is not None:
+            self.latencies.setdefault(scenario, []).append(latency)
+
+    def scenarios(self):
+        return sorted(set(self.latencies) | set(self.statuses) | set(self.failures))
+
+    def attempts(self, scenario):
+        return sum(self.statuses.get(scenario, {}).values()) + sum(self.failures.get(scenario, {}).values())
+
+
+async def client(host, port, mix, deadline, results, timeout=REQUEST_TIMEOUT):
+    """One simulated client: pick a scenario, run it, repeat until the deadline"""
+    scenarios = build_scenarios()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights)[0]
+        for method, path, body in scenarios[name]:
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(http_request(host, port, method, path, body), timeout)
+            except asyncio.TimeoutError:
+                results.record_failure(name, "timeout", timeout)
+                continue
+            except (OSError, ValueError, IndexError):
+                results.record_failure(name, "connection")
+                continue
+            results.record(name, time.perf_counter() - start, status)
+
+
+async def run_load(host, port, mix, concurrency, duration, rss_sampler=None, timeout=REQUEST_TIMEOUT):
+    """Run concurrency clients for duration seconds; return (results, elapsed)"""
+    results = Results()
+    start = time.perf_counter()
+    deadline = start + duration
+    tasks = [asyncio.create_task(client(host, port, mix, deadline, results, timeout)) for _ in range(concurrency)]
+
+    if rss_sampler is not None:
+        while time.perf_counter() < deadline:
+            # Scanning /proc is blocking; keep it off the event loop so clients are not stalled
+            await asyncio.to_thread(rss_sampler.sample)
+            await asyncio.sleep(1)
+
+    await asyncio.gather(*tasks)
+    return results, time.perf_counter() - start
+
+
+# ========== SERVER MANAGEMENT ==========
+def free_port():
+    """Ask the OS for an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(port, workers, extra_env):
+    """Start gunicorn serving app:app and wait until it answers"""
+    env = dict(os.environ, **extra_env)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--workers", str(workers),
+         "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+        cwd=ROOT, env=env,
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup (is it installed?)")
+        try:
+            probe = asyncio.wait_for(http_request("127.0.0.1", port, "GET", "/api/config"), REQUEST_TIMEOUT)
+            if asyncio.run(probe) == 200:
+                return process
+        except (OSError, IndexError, asyncio.TimeoutError):
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn did not become ready within 30 seconds")
+
+
+def stop_gunicorn(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def read_rss_kib(pid):
+    """Return the resident set size of a process in KiB (Linux /proc), or None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def read_smaps_kib(pid):
+    """
+    Return (pss, uss) in KiB from /proc/<pid>/smaps_rollup, or (None, None).
+    PSS splits shared pages between processes; USS counts only private pages.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].isdigit():
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        return None, None
+    if "Pss" not in fields:
+        return None, None
+    return fields["Pss"], fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+
+
+def child_pids(parent_pid):
+    """Return the PIDs of direct children of parent_pid (Linux /proc)"""
+    children = []
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 is the parent PID; the command name may contain spaces
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == parent_pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+class RssSampler:
+    """Tracks current and peak RSS of the gunicorn master and its workers"""
+
+    def __init__(self, master_pid):
+        self.master_pid = master_pid
+        self.peak = {}
+
+    def sample(self):
+        current = {}
+        for pid in [self.master_pid] + child_pids(self.master_pid):
+            rss = read_rss_kib(pid)
+            if rss is not None:
+                current[pid] = rss
+                self.peak[pid] = max(self.peak.get(pid, 0), rss)
+        return current
+
+    def report(self):
+        current = self.sample()
+        workers = []
+        for pid, rss in current.items():
+            if pid == self.master_pid:
+                continue
+            pss, uss = read_smaps_kib(pid)
+            workers.append({"pid": pid, "rssKiB": rss, "peakRssKiB": self.peak[pid], "pssKiB": pss, "ussKiB": uss})
+
+        def mean(key):
+            values = [w[key] for w in workers if w[key] is not None]
+            return round(sum(values) / len(values), 1) if values else None
+
+        worker_uss = [w["ussKiB"] for w in workers if w["ussKiB"] is not None]
+        return {
+            "masterRssKiB": current.get(self.master_pid),
+            "workers": workers,
+            "meanWorkerRssKiB": mean("rssKiB"),
+            "maxWorkerRssKiB": max(w["rssKiB"] for w in workers) if workers else None,
+            "meanWorkerPssKiB": mean("pssKiB"),
+            "meanWorkerUssKiB": mean("ussKiB"),
+            "maxWorkerUssKiB": max(worker_uss) if worker_uss else None,
+            "workerUssTargetKiB": WORKER_USS_TARGET_KIB,
+            "withinTarget": max(worker_uss) <= WORKER_USS_TARGET_KIB if worker_uss else None,
+        }
+
+
+# ========== REPORTING ==========
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize_latencies(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "meanMs": round(sum(values) / len(values) * 1000, 3) if values else None,
+        **{f"p{p}Ms": round(percentile(values, p) * 1000, 3) if values else None for p in (50, 90, 95, 99)},
+        "maxMs": round(values[-1] * 1000, 3) if values else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def error_rate(errors, attempts):
+    return round(errors / attempts, 4) if attempts else None
+
+
+def build_report(args, mix, results, elapsed, rss):
+    all_latencies = [lat for values in results.latencies.values() for lat in values]
+    status_totals = {}
+    for counts in results.statuses.values():
+        for status, count in counts.items():
+            status_totals[status] = status_totals.get(status, 0) + count
+    responses = sum(status_totals.values())
+    total = responses + results.errors
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "settings": {
+            "workers": args.workers if not args.url else None,
+            "concurrency": args.concurrency,
+            "durationSeconds": args.duration,
+            "timeoutSeconds": args.timeout,
+            "mix": mix,
+            "rateLimiter": not args.no_limiter,
+            "preload": not args.no_preload if not args.url else None,
+            "url": args.url,
+        },
+        "elapsedSeconds": round(elapsed, 3),
+        "requests": total,
+        "responses": responses,
+        "throughputRps": round(responses / elapsed, 2) if elapsed else None,
+        "errors": results.errors,
+        "timeouts": results.timeouts,
+        "errorRate": error_rate(results.errors, total),
+        "rateLimited": status_totals.get(429, 0),
+        "statusCodes": {str(k): v for k, v in sorted(status_totals.items())},
+        "latency": summarize_latencies(all_latencies),
+        "scenarios": {
+            name: {
+                "requests": results.attempts(name),
+                "errors": results.failures.get(name, {}),
+                "errorRate": error_rate(sum(results.failures.get(name, {}).values()), results.attempts(name)),
+                "latency": summarize_latencies(results.latencies.get(name, [])),
+                "statusCodes": {str(k): v for k, v in sorted(results.statuses.get(name, {}).items())},
+            }
+            for name in results.scenarios()
+        },
+        "memory": rss,
+    }
+
+
+def print_summary(report):
+    latency = report["latency"]
+    print(f"Requests:      {report['requests']} in {report['elapsedSeconds']}s "
+          f"({report['throughputRps']} responses/s)")
+    print(f"Latency (ms):  p50={latency['p50Ms']} p90={latency['p90Ms']} "
+          f"p99={latency['p99Ms']} max={latency['maxMs']} (timeouts counted at the timeout)")
+    print(f"Rate limited:  {report['rateLimited']}   Errors: {report['errors']} "
+          f"(timeouts: {report['timeouts']}, error rate: {report['errorRate']})")
+    for name, scenario in report["scenarios"].items():
+        print(f"  {name:<11} requests={scenario['requests']} p99={scenario['latency']['p99Ms']} ms "
+              f"error rate={scenario['errorRate']}")
+    memory = report["memory"]
+    if memory and memory["workers"]:
+        print(f"Worker RSS:    mean={memory['meanWorkerRssKiB']} KiB max={memory['maxWorkerRssKiB']} KiB "
+              f"(master {memory['masterRssKiB']} KiB)")
+        if memory["meanWorkerUssKiB"] is not None:
+            print(f"Worker USS:    mean={memory['meanWorkerUssKiB']} KiB max={memory['maxWorkerUssKiB']} KiB "
+                  f"PSS mean={memory['meanWorkerPssKiB']} KiB "
+                  f"(target <= {memory['workerUssTargetKiB']} KiB: {'met' if memory['withinTarget'] else 'missed'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Password Generator API")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="Simultaneous clients")
+    parser.add_argument("--duration", type=float, default=30, help="Test length in seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT, help="Per-request timeout in seconds")
+    parser.add_argument("--no-limiter", action="store_true", help="Disable rate limiting in the server")
+    parser.add_argument("--no-preload", action="store_true", help="Import the app in each worker instead of the master")
+    parser.add_argument("--url", help="Target an already running server instead of starting gunicorn")
+    parser.add_argument("--output", help="JSON report path (default: loadtest_results/<commit>_<time>.json)")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    process = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        host, port = "127.0.0.1", free_port()
+        extra_env = {}
+        if args.no_limiter:
+            extra_env["RATELIMIT_ENABLED"] = "False"
+        if args.no_preload:
+            extra_env["GUNICORN_PRELOAD"] = "False"
+        process = start_gunicorn(port, args.workers, extra_env)
+
+    try:
+        sampler = RssSampler(process.pid) if process else None
+        results, elapsed = asyncio.run(run_load(host, port, mix, args.concurrency, args.duration, sampler, args.timeout))
+        rss = sampler.report() if sampler else None
+    finally:
+        if process:
+            stop_gunicorn(process)
+
+    report = build_report(args, mix, results, elapsed, rss)
+    print_summary(report)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(ROOT, "loadtest_results", f"{report['commit'] or 'unknown'}_{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
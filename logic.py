@@ -6,6 +6,7 @@ Handles secure random generation and shared data methods.
 import secrets
 import string
 import logging
+from array import array
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -75,11 +76,96 @@ class GenerationError(Exception):
     """Custom exception for password generation errors"""
     pass
 
+# ========== PRELOADED TABLES ==========
+# Immutable lookup tables built once at import. Under gunicorn's preload mode they
+# are built in the master and shared with every worker through copy-on-write pages.
+# Only the word list is laid out to stay refcount-stable: one bytes blob plus an
+# offsets array, so a lookup touches those two object headers instead of one str
+# per word. The character pools and strength levels are small tuples of str handed
+# out directly, so using them dirties the few pages they sit on.
+
+class PackedWordList:
+    """
+    Read-only, sequence-like word list stored as one UTF-8 bytes blob plus an
+    array of offsets. Indexing decodes a fresh str, so sampling words never
+    touches the refcounts of shared objects.
+    """
+
+    def __init__(self, words):
+        encoded = [word.encode("utf-8") for word in words]
+        self._offsets = array("I", [0])
+        for item in encoded:
+            self._offsets.append(self._offsets[-1] + len(item))
+        self._blob = b"".join(encoded)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word index out of range")
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    @property
+    def nbytes(self):
+        """Memory used by the blob and offsets, in bytes"""
+        return len(self._blob) + self._offsets.itemsize * len(self._offsets)
+
+
+# Character class bits used by the strength table
+UPPER, LOWER, DIGIT, SYMBOL = 1, 2, 4, 8
+
+# Strength levels indexed by score (0-9): (strength_text, color_code)
+STRENGTH_LEVELS = (
+    ("Weak", "\033[91m"), ("Weak", "\033[91m"), ("Weak", "\033[91m"), ("Weak", "\033[91m"),  # Red
+    ("Medium", "\033[93m"), ("Medium", "\033[93m"),  # Yellow
+    ("Strong", "\033[92m"), ("Strong", "\033[92m"),  # Green
+    ("Very Strong", "\033[92m"), ("Very Strong", "\033[92m"),  # Green
+)
+
+PACKED_WORDS = None
+CHARACTER_POOLS = None
+CHAR_CLASS_TABLE = None
+
+def _pool_index(use_uppercase, use_lowercase, use_numbers, use_symbols, exclude_ambiguous):
+    return (bool(use_uppercase) << 4) | (bool(use_lowercase) << 3) | (bool(use_numbers) << 2) | (bool(use_symbols) << 1) | bool(exclude_ambiguous)
+
+def build_tables():
+    """
+    Build every immutable lookup table: the packed word list, all 32 character
+    pools and the ASCII character class table. Call in the gunicorn master
+    (preload) so workers inherit the tables instead of rebuilding them.
+    """
+    global PACKED_WORDS, CHARACTER_POOLS, CHAR_CLASS_TABLE
+
+    PACKED_WORDS = PackedWordList(WORD_LIST)
+
+    pools = [""] * 32
+    for flags in range(32):
+        options = [bool(flags & (1 << bit)) for bit in (4, 3, 2, 1, 0)]
+        pools[_pool_index(*options)] = _make_character_pool(*options)
+    CHARACTER_POOLS = tuple(pools)
+
+    table = bytearray(128)
+    for ch in string.ascii_uppercase:
+        table[ord(ch)] |= UPPER
+    for ch in string.ascii_lowercase:
+        table[ord(ch)] |= LOWER
+    for ch in string.digits:
+        table[ord(ch)] |= DIGIT
+    for ch in string.punctuation:
+        table[ord(ch)] |= SYMBOL
+    CHAR_CLASS_TABLE = bytes(table)
+
+    logger.debug(f"Lookup tables built: {len(PACKED_WORDS)} words in {PACKED_WORDS.nbytes} bytes")
+
 # ========== LOGIC FUNCTIONS ==========
 
-def build_character_pool(use_uppercase=True, use_lowercase=True, use_numbers=True, use_symbols=True, exclude_ambiguous=False):
+def _make_character_pool(use_uppercase, use_lowercase, use_numbers, use_symbols, exclude_ambiguous):
     """
-    Build a character pool for password generation.
+    Assemble a character pool from scratch (used by build_tables).
     """
     characters = ""
 
@@ -98,6 +184,12 @@ def build_character_pool(use_uppercase=True, use_lowercase=True, use_numbers=Tru
 
     return characters
 
+def build_character_pool(use_uppercase=True, use_lowercase=True, use_numbers=True, use_symbols=True, exclude_ambiguous=False):
+    """
+    Build a character pool for password generation.
+    """
+    return CHARACTER_POOLS[_pool_index(use_uppercase, use_lowercase, use_numbers, use_symbols, exclude_ambiguous)]
+
 def generate_password(length=12, use_uppercase=True, use_lowercase=True, use_numbers=True, use_symbols=True, exclude_ambiguous=False):
     """
     Generate a secure random password.
@@ -122,6 +214,31 @@ def apply_capitalization(words, capitalize_mode):
     else:  # 'lower' or default
         return [word.lower() for word in words]
 
+def sample_indices(n, k):
+    """
+    Draw k distinct indices from range(n) using a partial Fisher-Yates shuffle.
+    Only the swapped positions are tracked (in a dict), so time and memory
+    are O(k) no matter how large n is.
+    """
+    if k < 0 or k > n:
+        raise GenerationError(f"Cannot sample {k} distinct items from a population of {n}.")
+
+    swapped = {}
+    indices = []
+    for i in range(k):
+        j = i + secrets.randbelow(n - i)
+        indices.append(swapped.get(j, j))
+        swapped[j] = swapped.get(i, i)
+    return indices
+
+def sample_words(words, k):
+    """
+    Securely pick k distinct words from any sequence-like word list
+    (list, tuple, memory-mapped table, ...) without copying it.
+    Only len() and indexing are used.
+    """
+    return [words[i] for i in sample_indices(len(words), k)]
+
 def generate_passphrase(word_count=4, separator="-", add_numbers=True, add_symbols=True, capitalize_mode="title"):
     """
     Generate a secure random passphrase.
@@ -131,7 +248,7 @@ def generate_passphrase(word_count=4, separator="-", add_numbers=True, add_symbo
     
     # Secure sampling
     secure_random = secrets.SystemRandom()
-    selected_words = secure_random.sample(WORD_LIST, word_count)
+    selected_words = sample_words(PACKED_WORDS, word_count)
     
     # Capitalization
     selected_words = apply_capitalization(selected_words, capitalize_mode)
@@ -168,25 +285,31 @@ def calculate_strength(password):
     elif len(password) >= 8:
         strength += 1
     
+    # Collect character classes (ASCII via lookup table, others via str methods)
+    classes = 0
+    for c in password:
+        code = ord(c)
+        if code < 128:
+            classes |= CHAR_CLASS_TABLE[code]
+        else:
+            classes |= (UPPER if c.isupper() else 0) | (LOWER if c.islower() else 0) | (DIGIT if c.isdigit() else 0)
+    
     # Award points for character variety
-    if any(c.isupper() for c in password):
+    if classes & UPPER:
         strength += 1
-    if any(c.islower() for c in password):
+    if classes & LOWER:
         strength += 1
-    if any(c.isdigit() for c in password):
+    if classes & DIGIT:
         strength += 1
-    if any(c in string.punctuation for c in password):
+    if classes & SYMBOL:
         strength += 2
     
     # Determine overall strength level
-    if strength <= 3:
-        return (strength, "Weak", "\033[91m")  # Red
-    elif strength <= 5:
-        return (strength, "Medium", "\033[93m")  # Yellow
-    elif strength <= 7:
-        return (strength, "Strong", "\033[92m")  # Green
-    else:
-        return (strength, "Very Strong", "\033[92m")  # Green
+    strength_text, color_code = STRENGTH_LEVELS[strength]
+    return (strength, strength_text, color_code)
 
 def get_word_list():
     return WORD_LIST
+
+
+build_tables()
@@ -22,6 +22,13 @@ class Config:
     RATELIMIT_DEFAULT = os.environ.get('RATELIMIT_DEFAULT', '100 per minute')
     RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
     
+    # Idempotency Cache Configuration
+    IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 86400))
+    IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get('IDEMPOTENCY_MAX_ENTRIES', 10000))
+    IDEMPOTENCY_MAX_BYTES = int(os.environ.get('IDEMPOTENCY_MAX_BYTES', 4 * 1024 * 1024))
+    IDEMPOTENCY_STORE_PATH = os.environ.get('IDEMPOTENCY_STORE_PATH')  # Shared by all workers; unset = per-process cache
+    IDEMPOTENCY_SECRET = os.environ.get('IDEMPOTENCY_SECRET')  # Encryption key; required with a shared store
+    
     # Password Generation Constraints
     PASSWORD_MIN_LENGTH = int(os.environ.get('PASSWORD_MIN_LENGTH', 4))
     PASSWORD_MAX_LENGTH = int(os.environ.get('PASSWORD_MAX_LENGTH', 128))
@@ -0,0 +1,340 @@
+"""
+Tests for the Idempotency-Key response cache.
+"""
+
+import multiprocessing
+import os
+import sqlite3
+
+import pytest
+
+from idempotency import (
+    ENTRY_OVERHEAD_BYTES,
+    PENDING_TIMEOUT_SECONDS,
+    IdempotencyCache,
+    IdempotencyConflict,
+    IdempotencyCorrupted,
+    IdempotencyInProgress,
+    IdempotencyStoreError,
+)
+
+SCOPE = "/api/generate-password"
+BODY = b'{"length": 16}'
+RESPONSE = b'{"password": "X7k#mP2@qR9zL4wN"}'
+SECRET = "test-secret"
+
+
+class FakeClock:
+    """Manually advanced clock passed through the cache's clock= hook"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "idempotency.sqlite3")
+
+
+@pytest.fixture
+def cache(store_path, clock):
+    return IdempotencyCache(path=store_path, secret=SECRET, ttl_seconds=60, clock=clock)
+
+
+def store(cache, key, body=BODY, response=RESPONSE):
+    assert cache.begin(SCOPE, key, body) is None
+    cache.complete(SCOPE, key, response)
+
+
+def table_totals(store_path):
+    """Entry count and byte total recomputed from the table itself"""
+    conn = sqlite3.connect(store_path)
+    totals = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+    conn.close()
+    return totals
+
+
+# ========== REPLAY ==========
+def test_replay_returns_original_response(cache):
+    store(cache, "key-1")
+    assert cache.begin(SCOPE, "key-1", BODY) == RESPONSE
+    assert cache.stats()["hits"] == 1
+
+
+def test_scopes_are_independent(cache):
+    store(cache, "key-1")
+    assert cache.begin("/api/generate-passphrase", "key-1", BODY) is None
+
+
+def test_replay_is_shared_between_workers(store_path, clock):
+    """Two caches on the same store behave like two gunicorn workers"""
+    first = IdempotencyCache(path=store_path, secret=SECRET, clock=clock)
+    second = IdempotencyCache(path=store_path, secret=SECRET, clock=clock)
+    store(first, "key-1")
+    assert second.begin(SCOPE, "key-1", BODY) == RESPONSE
+
+
+def _begin_in_child(store_path, queue):
+    cache = IdempotencyCache(path=store_path, secret=SECRET)
+    try:
+        queue.put(cache.begin(SCOPE, "key-1", BODY))
+    except IdempotencyInProgress:
+        queue.put("in-progress")
+
+
+def test_pending_entry_is_visible_to_other_processes(store_path):
+    cache = IdempotencyCache(path=store_path, secret=SECRET)
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+
+    queue = multiprocessing.get_context("fork").Queue()
+    child = multiprocessing.get_context("fork").Process(target=_begin_in_child, args=(store_path, queue))
+    child.start()
+    child.join(10)
+    assert queue.get(timeout=1) == "in-progress"
+
+    cache.complete(SCOPE, "key-1", RESPONSE)
+    child = multiprocessing.get_context("fork").Process(target=_begin_in_child, args=(store_path, queue))
+    child.start()
+    child.join(10)
+    assert queue.get(timeout=1) == RESPONSE
+
+
+# ========== CONFLICTS AND RESERVATIONS ==========
+def test_different_body_is_a_conflict(cache):
+    store(cache, "key-1")
+    with pytest.raises(IdempotencyConflict):
+        cache.begin(SCOPE, "key-1", b'{"length": 20}')
+    assert cache.stats()["conflicts"] == 1
+
+
+def test_duplicate_while_pending_is_in_progress(cache):
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+    with pytest.raises(IdempotencyInProgress):
+        cache.begin(SCOPE, "key-1", BODY)
+
+
+def test_abandoned_reservation_can_be_retaken(cache, clock):
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+    clock.now += PENDING_TIMEOUT_SECONDS
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+
+
+def test_release_allows_retry(cache):
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+    cache.release(SCOPE, "key-1")
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_release_keeps_completed_entries(cache):
+    store(cache, "key-1")
+    cache.release(SCOPE, "key-1")
+    assert cache.begin(SCOPE, "key-1", BODY) == RESPONSE
+
+
+# ========== EXPIRY AND EVICTION ==========
+def test_expired_entry_is_regenerated(cache, clock):
+    store(cache, "key-1")
+    clock.now += 60
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+
+
+def test_stats_exclude_expired_entries(cache, clock):
+    store(cache, "key-1")
+    store(cache, "key-2")
+    clock.now += 60
+    stats = cache.stats()
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+
+
+def test_stats_is_read_only(cache, clock, store_path):
+    store(cache, "key-1")
+    clock.now += 60
+    cache.stats()
+    assert table_totals(store_path)[0] == 1  # purged by the next write, not by stats()
+
+
+def test_expired_entries_are_purged_on_write(cache, clock, store_path):
+    store(cache, "key-1")
+    store(cache, "key-2")
+    clock.now += 60
+    store(cache, "key-3")
+    assert table_totals(store_path)[0] == 1
+
+
+def test_running_totals_match_table(store_path, clock):
+    cache = IdempotencyCache(path=store_path, secret=SECRET, max_entries=5, ttl_seconds=30, clock=clock)
+    for i in range(20):
+        clock.now += 3
+        if i % 4 == 0:
+            cache.begin(SCOPE, f"key-{i}", BODY)
+            cache.release(SCOPE, f"key-{i}")
+        elif i % 4 == 1:
+            cache.begin(SCOPE, f"key-{i}", BODY)  # left pending
+        else:
+            store(cache, f"key-{i}", response=b"x" * i)
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == table_totals(store_path)
+    assert stats["entries"] <= 5
+
+
+def test_least_recently_used_entry_is_evicted(store_path, clock):
+    cache = IdempotencyCache(path=store_path, secret=SECRET, max_entries=2, clock=clock)
+    store(cache, "key-1")
+    clock.now += 1
+    store(cache, "key-2")
+    clock.now += 1
+    assert cache.begin(SCOPE, "key-1", BODY) == RESPONSE  # key-1 is now most recent
+    clock.now += 1
+    store(cache, "key-3")
+
+    assert cache.begin(SCOPE, "key-2", BODY) is None
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_byte_cap_is_enforced(store_path, clock):
+    max_bytes = 3 * (ENTRY_OVERHEAD_BYTES + 100)
+    cache = IdempotencyCache(path=store_path, secret=SECRET, max_bytes=max_bytes, clock=clock)
+    for i in range(10):
+        clock.now += 1
+        store(cache, f"key-{i}", response=b"x" * 80)
+    stats = cache.stats()
+    assert stats["bytes"] <= max_bytes
+    assert stats["entries"] < 10
+
+
+def test_oversized_response_is_not_kept(store_path, clock):
+    cache = IdempotencyCache(path=store_path, secret=SECRET, max_bytes=ENTRY_OVERHEAD_BYTES + 10, clock=clock)
+    store(cache, "key-1", response=b"x" * 1000)
+    assert cache.stats()["entries"] == 0
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+
+
+# ========== ENCRYPTION ==========
+def test_responses_and_keys_are_not_stored_in_clear(cache, store_path):
+    store(cache, "key-1")
+    conn = sqlite3.connect(store_path)
+    rows = conn.execute("SELECT id, ciphertext FROM entries").fetchall()
+    conn.close()
+    assert len(rows) == 1
+    entry_id, ciphertext = rows[0]
+    assert b"key-1" not in entry_id
+    assert b"X7k#mP2@qR9zL4wN" not in ciphertext
+
+
+def test_tampered_entry_raises_and_is_dropped(cache, store_path):
+    store(cache, "key-1")
+    conn = sqlite3.connect(store_path)
+    conn.execute("UPDATE entries SET ciphertext = ?", (b"\0" * 48,))
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(IdempotencyCorrupted):
+        cache.begin(SCOPE, "key-1", BODY)
+    assert cache.begin(SCOPE, "key-1", BODY) is None
+
+
+def test_key_is_not_stored(cache, store_path):
+    store(cache, "key-1")
+    conn = sqlite3.connect(store_path)
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert tables == {"counters", "entries"}
+
+
+def test_configured_secret_must_match_to_replay(store_path, clock):
+    store(IdempotencyCache(path=store_path, secret="one", clock=clock), "key-1")
+    assert IdempotencyCache(path=store_path, secret="two", clock=clock).begin(SCOPE, "key-1", BODY) is None
+    assert IdempotencyCache(path=store_path, secret="one", clock=clock).begin(SCOPE, "key-1", BODY) == RESPONSE
+
+
+# ========== STORE SAFETY ==========
+def test_shared_store_requires_secret(store_path):
+    with pytest.raises(IdempotencyStoreError):
+        IdempotencyCache(path=store_path)
+
+
+def test_default_cache_is_private_to_the_process(clock):
+    cache = IdempotencyCache(clock=clock)
+    assert not cache.shared
+    store(cache, "key-1")
+    assert cache.begin(SCOPE, "key-1", BODY) == RESPONSE
+
+
+def test_store_file_is_created_owner_only(cache, store_path):
+    store(cache, "key-1")
+    assert os.stat(store_path).st_mode & 0o777 == 0o600
+
+
+def test_symlinked_store_is_rejected(tmp_path):
+    target = tmp_path / "elsewhere.sqlite3"
+    target.write_bytes(b"")
+    link = tmp_path / "store.sqlite3"
+    link.symlink_to(target)
+    cache = IdempotencyCache(path=str(link), secret=SECRET)
+    with pytest.raises(IdempotencyStoreError):
+        cache.begin(SCOPE, "key-1", BODY)
+
+
+def test_store_readable_by_others_is_rejected(store_path):
+    fd = os.open(store_path, os.O_CREAT | os.O_WRONLY, 0o644)
+    os.close(fd)
+    os.chmod(store_path, 0o644)
+    cache = IdempotencyCache(path=store_path, secret=SECRET)
+    with pytest.raises(IdempotencyStoreError):
+        cache.begin(SCOPE, "key-1", BODY)
+
+
+def test_world_writable_directory_is_rejected(tmp_path):
+    shared_dir = tmp_path / "shared"
+    shared_dir.mkdir()
+    os.chmod(shared_dir, 0o777)
+    cache = IdempotencyCache(path=str(shared_dir / "store.sqlite3"), secret=SECRET)
+    with pytest.raises(IdempotencyStoreError):
+        cache.begin(SCOPE, "key-1", BODY)
+
+
+# ========== API ==========
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import app as app_module
+
+    cache = IdempotencyCache(path=str(tmp_path / "app.sqlite3"), secret=SECRET)
+    monkeypatch.setattr(app_module, "idempotency_cache", cache)
+    app_module.app.config["TESTING"] = True
+    app_module.limiter.enabled = False
+    yield app_module.app.test_client()
+    app_module.limiter.enabled = True
+
+
+def test_api_replays_across_client_addresses(client):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client.post("/api/generate-password", json={"length": 16}, headers=headers,
+                        environ_base={"REMOTE_ADDR": "10.0.0.1"})
+    second = client.post("/api/generate-password", json={"length": 16}, headers=headers,
+                         environ_base={"REMOTE_ADDR": "172.16.0.9"})
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+
+def test_api_rejects_reused_key_with_different_body(client):
+    headers = {"Idempotency-Key": "retry-2"}
+    client.post("/api/generate-passphrase", json={"wordCount": 4}, headers=headers)
+    response = client.post("/api/generate-passphrase", json={"wordCount": 5}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_api_does_not_cache_errors(client):
+    headers = {"Idempotency-Key": "retry-3"}
+    assert client.post("/api/generate-password", json={"length": 2}, headers=headers).status_code == 400
+    assert client.get("/api/idempotency-stats").get_json()["entries"] == 0
@@ -0,0 +1,108 @@
+"""
+Tests for the load test harness helpers.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import loadtest
+
+
+# ========== PERCENTILES ==========
+def test_percentile_is_nearest_rank():
+    values = [1, 2, 3, 4, 5]
+    assert loadtest.percentile(values, 50) == 3
+    assert loadtest.percentile(values, 20) == 1
+    assert loadtest.percentile(values, 21) == 2
+    assert loadtest.percentile(values, 99) == 5
+    assert loadtest.percentile(values, 100) == 5
+
+
+def test_percentile_on_hundred_values():
+    values = list(range(1, 101))
+    assert loadtest.percentile(values, 50) == 50
+    assert loadtest.percentile(values, 90) == 90
+    assert loadtest.percentile(values, 99) == 99
+
+
+def test_percentile_edge_cases():
+    assert loadtest.percentile([], 50) is None
+    assert loadtest.percentile([7], 1) == 7
+    assert loadtest.percentile([7], 99) == 7
+
+
+# ========== LATENCY SUMMARY ==========
+def test_summarize_latencies_in_milliseconds():
+    summary = loadtest.summarize_latencies([0.004, 0.001, 0.003, 0.002, 0.005])
+    assert summary["count"] == 5
+    assert summary["meanMs"] == 3.0
+    assert summary["p50Ms"] == 3.0
+    assert summary["p99Ms"] == 5.0
+    assert summary["maxMs"] == 5.0
+
+
+def test_summarize_latencies_empty():
+    summary = loadtest.summarize_latencies([])
+    assert summary["count"] == 0
+    assert summary["meanMs"] is None
+    assert summary["p99Ms"] is None
+    assert summary["maxMs"] is None
+
+
+# ========== MIX PARSING ==========
+def test_parse_mix_weights():
+    assert loadtest.parse_mix("password=50, passphrase=30") == {"password": 50.0, "passphrase": 30.0}
+
+
+def test_parse_mix_default_weight():
+    assert loadtest.parse_mix("config") == {"config": 1.0}
+
+
+def test_parse_mix_allows_zero_weight_with_positive_total():
+    assert loadtest.parse_mix("password=0,batch=1") == {"password": 0.0, "batch": 1.0}
+
+
+@pytest.mark.parametrize("text", [
+    "password=-1",
+    "password=5,batch=-1",
+    "password=0",
+    "password=0,config=0",
+    "unknown=5",
+    "password=abc",
+])
+def test_parse_mix_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        loadtest.parse_mix(text)
+
+
+# ========== FAILURES ==========
+def test_timeouts_are_counted_in_latencies(monkeypatch):
+    async def stalled(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(loadtest, "http_request", stalled)
+    results = loadtest.Results()
+    deadline = time.perf_counter() + 0.01
+    asyncio.run(loadtest.client("127.0.0.1", 1, {"config": 1}, deadline, results, timeout=0.05))
+
+    assert results.timeouts == results.errors >= 1
+    assert results.failures["config"]["timeout"] == results.timeouts
+    assert results.latencies["config"] == [0.05] * results.timeouts
+
+
+def test_connection_errors_get_an_error_rate(monkeypatch):
+    async def refused(*args, **kwargs):
+        raise ConnectionRefusedError()
+
+    monkeypatch.setattr(loadtest, "http_request", refused)
+    results = loadtest.Results()
+    results.record("config", 0.001, 200)
+    deadline = time.perf_counter() + 0.01
+    asyncio.run(loadtest.client("127.0.0.1", 1, {"config": 1}, deadline, results))
+
+    errors = results.failures["config"]["connection"]
+    assert results.attempts("config") == errors + 1
+    assert loadtest.error_rate(errors, results.attempts("config")) == round(errors / (errors + 1), 4)
+    assert results.latencies["config"] == [0.001]
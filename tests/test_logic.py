@@ -0,0 +1,154 @@
+"""
+Tests for the shared generation logic.
+"""
+
+import collections
+import random
+import string
+
+import pytest
+
+import logic
+
+
+# ========== SAMPLING ==========
+def test_sample_indices_are_distinct_and_in_range():
+    for _ in range(200):
+        indices = logic.sample_indices(50, 10)
+        assert len(indices) == 10
+        assert len(set(indices)) == 10
+        assert all(0 <= i < 50 for i in indices)
+
+
+def test_sample_indices_full_population_is_a_permutation():
+    for _ in range(50):
+        assert sorted(logic.sample_indices(12, 12)) == list(range(12))
+
+
+def test_sample_indices_zero():
+    assert logic.sample_indices(10, 0) == []
+    assert logic.sample_indices(0, 0) == []
+
+
+@pytest.mark.parametrize("n, k", [(5, 6), (0, 1), (5, -1)])
+def test_sample_indices_rejects_invalid_k(n, k):
+    with pytest.raises(logic.GenerationError):
+        logic.sample_indices(n, k)
+
+
+def test_sample_indices_can_draw_every_index():
+    counts = collections.Counter()
+    for _ in range(2000):
+        counts.update(logic.sample_indices(20, 3))
+    assert set(counts) == set(range(20))
+    # 300 expected draws per index; a fair sampler stays far inside these bounds
+    assert min(counts.values()) > 150
+    assert max(counts.values()) < 450
+
+
+def test_sample_words_from_list():
+    words = ["alpha", "beta", "gamma", "delta"]
+    sample = logic.sample_words(words, 3)
+    assert len(set(sample)) == 3
+    assert set(sample) <= set(words)
+
+
+def test_sample_words_from_non_list_sequences():
+    words = ["alpha", "beta", "gamma", "delta", "epsilon"]
+    for backend in (tuple(words), logic.PackedWordList(words)):
+        sample = logic.sample_words(backend, 5)
+        assert sorted(sample) == sorted(words)
+
+
+def test_generate_passphrase_uses_distinct_words():
+    passphrase = logic.generate_passphrase(word_count=6, separator=" ", add_numbers=False,
+                                           add_symbols=False, capitalize_mode="lower")
+    words = passphrase.split(" ")
+    assert len(words) == len(set(words)) == 6
+    assert set(words) <= set(logic.WORD_LIST)
+
+
+# ========== PRELOADED TABLES ==========
+def test_packed_word_list_round_trip():
+    words = ["cat", "", "crème", "日本", "dragon"]
+    packed = logic.PackedWordList(words)
+    assert len(packed) == len(words)
+    assert [packed[i] for i in range(len(packed))] == words
+
+
+def test_packed_word_list_negative_indices():
+    packed = logic.PackedWordList(["a", "b", "c"])
+    assert packed[-1] == "c"
+    assert packed[-3] == "a"
+
+
+@pytest.mark.parametrize("index", [3, 100, -4])
+def test_packed_word_list_index_error(index):
+    packed = logic.PackedWordList(["a", "b", "c"])
+    with pytest.raises(IndexError):
+        packed[index]
+
+
+def test_packed_words_match_word_list():
+    assert len(logic.PACKED_WORDS) == len(logic.WORD_LIST)
+    assert list(logic.PACKED_WORDS) == logic.WORD_LIST
+
+
+def test_all_character_pools_match_direct_build():
+    assert len(logic.CHARACTER_POOLS) == 32
+    for flags in range(32):
+        options = [bool(flags & (1 << bit)) for bit in (4, 3, 2, 1, 0)]
+        assert logic.build_character_pool(*options) == logic._make_character_pool(*options), options
+
+
+def test_character_pools_pinned_values():
+    full = string.ascii_uppercase + string.ascii_lowercase + string.digits + string.punctuation
+    assert logic.build_character_pool() == full
+    assert logic.build_character_pool(exclude_ambiguous=True) == "".join(c for c in full if c not in "0Ol1I")
+    assert logic.build_character_pool(False, False, True, False) == string.digits
+    assert logic.build_character_pool(False, False, False, False) == ""
+
+
+def reference_strength(password):
+    """calculate_strength as written before the lookup tables, kept to pin its scores"""
+    strength = 0
+    if len(password) >= 16:
+        strength += 3
+    elif len(password) >= 12:
+        strength += 2
+    elif len(password) >= 8:
+        strength += 1
+    if any(c.isupper() for c in password):
+        strength += 1
+    if any(c.islower() for c in password):
+        strength += 1
+    if any(c.isdigit() for c in password):
+        strength += 1
+    if any(c in string.punctuation for c in password):
+        strength += 2
+    if strength <= 3:
+        return (strength, "Weak", "\033[91m")
+    elif strength <= 5:
+        return (strength, "Medium", "\033[93m")
+    elif strength <= 7:
+        return (strength, "Strong", "\033[92m")
+    else:
+        return (strength, "Very Strong", "\033[92m")
+
+
+@pytest.mark.parametrize("password", [
+    "", "a", "A", "1", "!", "abcdefgh", "ABCDEFGHIJKL", "12345678", "!@#$%^&*",
+    "Password1!", "Purple-Dragon-Mountain-Ocean-42!", "X7k#mP2@qR9zL4wN",
+    "   spaces   ", "tab\there", "ÉCOLE", "école", "Ⅻ²٣", "日本語のパスワード", "Straße-2024!",
+    "ǅungla", "µ", "Ω", "°±§", "\x7f\x00",
+])
+def test_calculate_strength_matches_reference_rules(password):
+    assert logic.calculate_strength(password) == reference_strength(password)
+
+
+def test_calculate_strength_matches_reference_on_random_samples():
+    rng = random.Random(1234)
+    alphabet = string.printable + "ÉéßÅåΩµǅ²٣Ⅻ日本°§¿€"
+    for _ in range(5000):
+        password = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+        assert logic.calculate_strength(password) == reference_strength(password), password